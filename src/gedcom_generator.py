@@ -1,16 +1,55 @@
-import json
 import argparse
+import sys
+
+import orjson
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Set
+from typing import Dict, Iterator, List, Optional, Tuple, Set
+
+import ijson
 
 DATA_DIR = Path(__file__).parent / ".." / "data"
 
+# Month abbreviations indexed by month number (index 0 unused), matching the
+# output of strftime("%b") without going through datetime on every call.
+_MONTH_ABBR = ("", "Jan", "Feb", "Mar", "Apr", "May", "Jun",
+               "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+# Days per month (index 0 unused); February is adjusted for leap years
+# where it matters, so invalid dates are rejected just like datetime did.
+_DAYS_IN_MONTH = (0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+# Constant GEDCOM framing lines, built once at import instead of per export.
+_HEADER_LINES = (
+    "0 HEAD",
+    "1 SOUR 23andMeScraper",
+    "2 VERS 1.0",
+    "2 NAME 23andMe Family Tree Exporter",
+    "1 CHAR UTF-8",
+    "1 GEDC",
+    "2 VERS 5.5.1",
+    "2 FORM LINEAGE-LINKED",
+)
+_TRAILER_LINE = "0 TRLR"
+
+# Annotation occurrence keys and their ready-made GEDCOM event lines.
+_EVENTS = (
+    ("birth_occurrence", "1 BIRT"),
+    ("death_occurrence", "1 DEAT"),
+    ("residence_occurrence", "1 RESI"),
+)
+# Prefixes for the dynamic sub-lines; plain concatenation beats re-running
+# f-string formatting for every emitted line.
+_DATE_PREFIX = "2 DATE "
+_PLAC_PREFIX = "2 PLAC "
+
 class GedcomIdGenerator:
+    __slots__ = ("gedcom_ids", "indi_count", "family_count", "family_structs")
+
     def __init__(self):
         """Initialize the GedcomIdGenerator with empty ID mappings."""
         self.gedcom_ids = {}
-        self.family_ids = []
+        self.indi_count = 0
+        self.family_count = 0
         self.family_structs: List[Tuple[str, str, str, List[str]]] = []
 
     def get_gedcom_id(self, key: str) -> str:
@@ -22,9 +61,12 @@ class GedcomIdGenerator:
         Returns:
             str: The GEDCOM ID associated with the key.
         """
-        if key not in self.gedcom_ids:
-            self.gedcom_ids[key] = f"@I{len(self.gedcom_ids) + 1}@"
-        return self.gedcom_ids[key]
+        gid = self.gedcom_ids.get(key)
+        if gid is None:
+            self.indi_count += 1
+            gid = f"@I{self.indi_count}@"
+            self.gedcom_ids[key] = gid
+        return gid
 
     def new_family_id(self) -> str:
         """Generate a new family ID.
@@ -32,61 +74,87 @@ class GedcomIdGenerator:
         Returns:
             str: A new family ID.
         """
-        fid = f"@F{len(self.family_ids) + 1}@"
-        self.family_ids.append(fid)
-        return fid
+        self.family_count += 1
+        return f"@F{self.family_count}@"
+
+def iter_relatives(data_dir: Path) -> Iterator[dict]:
+    """Stream relatives records from relatives_10.json one at a time.
+
+    Args:
+        data_dir (Path): The directory containing the JSON files.
+
+    Yields:
+        dict: One relatives record at a time, parsed lazily.
+    """
+    with open(data_dir / "relatives_10.json", "rb") as f:
+        yield from ijson.items(f, "item")
 
-def load_data(data_dir: Path) -> Tuple[List[dict], List[dict], List[dict]]:
+def load_data(data_dir: Path) -> Tuple[List[dict], List[dict], Iterator[dict]]:
     """Load data from JSON files in the specified directory.
 
+    The relatives file is not parsed up front; a lazy iterator is returned
+    instead, so its records only materialize if a consumer asks for them.
+
     Args:
         data_dir (Path): The directory containing the JSON files.
 
     Returns:
-        Tuple[List[dict], List[dict], List[dict]]: The loaded tree nodes, annotations, and relatives.
+        Tuple[List[dict], List[dict], Iterator[dict]]: The loaded tree nodes,
+        annotations, and a lazy iterator over relatives.
     """
-    with open(data_dir / "tree.json") as f:
-        tree_nodes = json.load(f)
-    with open(data_dir / "annotations.json") as f:
-        annotations = json.load(f)
-    with open(data_dir / "relatives_10.json") as f:
-        relatives = json.load(f)
+    tree_nodes = orjson.loads((data_dir / "tree.json").read_bytes())
+    annotations = orjson.loads((data_dir / "annotations.json").read_bytes())
+    relatives = iter_relatives(data_dir)
     return tree_nodes, annotations, relatives
 
-def normalize_tree_nodes(tree_nodes: List[dict]) -> Dict[str, dict]:
+def normalize_tree_nodes(
+    tree_nodes: List[dict],
+    profile_id_to_tree_id: Optional[Dict[str, str]] = None,
+) -> Dict[str, dict]:
     """Normalize tree nodes to map profile IDs to node IDs.
 
     Args:
         tree_nodes (List[dict]): The list of tree nodes to normalize.
+        profile_id_to_tree_id (Optional[Dict[str, str]]): If given, filled with
+            a profile-ID-to-normalized-key mapping during the same pass.
 
     Returns:
         Dict[str, dict]: A dictionary mapping normalized IDs to tree nodes.
     """
     id_to_profile = {}
-    profile_to_id = {}
     for node in tree_nodes:
         pid = node.get("profile_id")
         nid = node.get("id")
         if pid:
-            profile_to_id[pid] = nid
             id_to_profile[nid] = pid
 
     tree_by_id: Dict[str, dict] = {}
     for node in tree_nodes:
-        key = node.get("profile_id") or node["id"]  # Use profile_id or id as key
+        profile_id = node.get("profile_id")
+        key = profile_id or node["id"]  # Use profile_id or id as key
         if not key:
             continue
-        normalized_node = dict(node)  # shallow copy
-        normalized_node["id"] = key
+        # Intern ids: the same id string is referenced from many nodes, so
+        # sharing one interned copy cuts memory and speeds dict lookups.
+        key = sys.intern(key)
+        if profile_id and profile_id_to_tree_id is not None:
+            profile_id_to_tree_id[profile_id] = key
+        # Mutate the node in place: it comes straight from load_data and has
+        # no other consumer, so a per-node shallow copy is wasted work.
+        node["id"] = key
+
+        # Canonicalize sex once here so downstream code never re-uppercases
+        sex = node.get("sex")
+        node["sex"] = sex.upper() if sex else ""
 
         # Normalize parent and partner IDs using the mapping
-        normalized_node["parent_ids"] = [
-            id_to_profile.get(pid, pid) for pid in node.get("parent_ids", [])
+        node["parent_ids"] = [
+            sys.intern(id_to_profile.get(pid, pid)) for pid in node.get("parent_ids", [])
         ]
-        normalized_node["partner_ids"] = [
-            id_to_profile.get(pid, pid) for pid in node.get("partner_ids", [])
+        node["partner_ids"] = [
+            sys.intern(id_to_profile.get(pid, pid)) for pid in node.get("partner_ids", [])
         ]
-        tree_by_id[key] = normalized_node
+        tree_by_id[key] = node
     return tree_by_id
 
 def map_annotations(annotations: List[dict]) -> Dict[str, dict]:
@@ -102,17 +170,24 @@ def map_annotations(annotations: List[dict]) -> Dict[str, dict]:
     for v in annotations:
         key = v.get("profile_id") or v["tree_node_id"]
         if key:
-            anno_by_id[key] = v
+            anno_by_id[sys.intern(key)] = v
     return anno_by_id
 
 class GedcomExporter:
-    def __init__(self, tree_nodes: List[dict], annotations: List[dict], relatives: List[dict], verbose: bool = True):
+    __slots__ = (
+        "tree_nodes_raw", "annotations", "relatives", "verbose",
+        "tree_by_id", "anno_by_id", "profile_id_to_tree_id",
+        "children_by_parent_pair", "gedcom", "seen_gedcom_ids",
+        "created_families", "famc_by_individual", "fams_by_individual",
+    )
+
+    def __init__(self, tree_nodes: List[dict], annotations: List[dict], relatives: Iterator[dict], verbose: bool = True):
         """Initialize the GedcomExporter with tree nodes, annotations, and relatives.
 
         Args:
             tree_nodes (List[dict]): The raw tree nodes.
             annotations (List[dict]): The annotations corresponding to the tree nodes.
-            relatives (List[dict]): The relatives data.
+            relatives (Iterator[dict]): Lazy iterator over the relatives data.
             verbose (bool, optional): Flag for verbose output. Defaults to True.
         """
         self.tree_nodes_raw = tree_nodes
@@ -120,16 +195,43 @@ class GedcomExporter:
         self.relatives = relatives
         self.verbose = verbose
 
-        self.tree_by_id = normalize_tree_nodes(tree_nodes)
+        # Map profile IDs to tree node IDs for easy access; filled by
+        # normalize_tree_nodes in the same pass that builds tree_by_id.
+        self.profile_id_to_tree_id: Dict[str, str] = {}
+        self.tree_by_id = normalize_tree_nodes(tree_nodes, self.profile_id_to_tree_id)
         self.anno_by_id = map_annotations(annotations)
-        # Map profile IDs to tree node IDs for easy access
-        self.profile_id_to_tree_id = {
-            v["profile_id"]: k for k, v in self.tree_by_id.items() if v.get("profile_id")
-        }
+
+        # Index children by their (normalized) parent pair so family builders
+        # can look them up in O(1) instead of rescanning every node.
+        self.children_by_parent_pair: Dict[frozenset, List[str]] = {}
+        for cid, cnode in self.tree_by_id.items():
+            parent_ids = cnode.get("parent_ids", [])
+            if len(parent_ids) >= 2:
+                pair = frozenset(parent_ids[:2])
+                self.children_by_parent_pair.setdefault(pair, []).append(cid)
 
         self.gedcom = GedcomIdGenerator()
         self.seen_gedcom_ids: Set[str] = set()
-        self.created_families: Set[Tuple[str, str]] = set()
+        self.created_families: Set[frozenset] = set()
+        # Per-individual family links, filled as families are registered, so
+        # build_individual_entry does not rescan every family per individual.
+        self.famc_by_individual: Dict[str, List[str]] = {}
+        self.fams_by_individual: Dict[str, List[str]] = {}
+
+    def _register_family(self, fid: str, husb_id: str, wife_id: str, children: List[str]) -> None:
+        """Record a family structure and index its FAMS/FAMC links per individual.
+
+        Args:
+            fid (str): The GEDCOM family ID.
+            husb_id (str): The node ID of the husband/first partner.
+            wife_id (str): The node ID of the wife/second partner.
+            children (List[str]): The node IDs of the children.
+        """
+        self.gedcom.family_structs.append((fid, husb_id, wife_id, children))
+        self.fams_by_individual.setdefault(husb_id, []).append(fid)
+        self.fams_by_individual.setdefault(wife_id, []).append(fid)
+        for cid in children:
+            self.famc_by_individual.setdefault(cid, []).append(fid)
 
     def generate_gedcom_lines(self) -> List[str]:
         """Generate GEDCOM lines for the export.
@@ -137,34 +239,30 @@ class GedcomExporter:
         Returns:
             List[str]: The list of GEDCOM lines.
         """
-        lines: List[str] = [
-            "0 HEAD",
-            "1 SOUR 23andMeScraper",
-            "2 VERS 1.0",
-            "2 NAME 23andMe Family Tree Exporter",
-            "1 CHAR UTF-8",
-            "1 GEDC",
-            "2 VERS 5.5.1",
-            "2 FORM LINEAGE-LINKED"
-        ]
+        lines: List[str] = list(_HEADER_LINES)
 
-        lines += self.build_family_entries()  # Add family entries
+        self.build_family_entries(lines)  # Add family entries
 
+        anno_get = self.anno_by_id.get
+        build = self.build_individual_entry
         for node_id, node in self.tree_by_id.items():
-            anno = self.anno_by_id.get(node_id)
-            lines += self.build_individual_entry(node_id, node, anno)
+            build(node_id, node, anno_get(node_id), lines)
 
-        lines.append("0 TRLR")
+        lines.append(_TRAILER_LINE)
         return lines
 
     def write_to_file(self, lines: List[str], output_path: Path):
         """Write the generated GEDCOM lines to a file.
 
+        Lines are streamed through a buffered writer instead of joined into
+        one large string first, so peak memory stays at one document copy.
+
         Args:
             lines (List[str]): The list of GEDCOM lines to write.
             output_path (Path): The path to the output file.
         """
-        output_path.write_text("\n".join(lines), encoding="utf-8")
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.writelines(f"{line}\n" for line in lines)
 
     def export(self, output_path: Path):
         """Export the GEDCOM data to a file.
@@ -175,7 +273,7 @@ class GedcomExporter:
         lines = self.generate_gedcom_lines()
         self.write_to_file(lines, output_path)
         if self.verbose:
-            print(f"Exported {len(self.gedcom.gedcom_ids)} individuals and {len(self.gedcom.family_ids)} families.")
+            print(f"Exported {self.gedcom.indi_count} individuals and {self.gedcom.family_count} families.")
 
     def _format_name(self, fname: Optional[str], lname: Optional[str]) -> Optional[str]:
         """Format the name for GEDCOM output.
@@ -204,71 +302,25 @@ class GedcomExporter:
             return f"1 SEX {sex}"
         return None
 
-    def _format_birth(self, annotation: dict) -> List[str]:
-        """Format birth information for GEDCOM output.
-
-        Args:
-            annotation (dict): The annotation containing birth information.
-
-        Returns:
-            List[str]: List of GEDCOM lines for birth information.
-        """
-        lines = []
-        occ = annotation.get("birth_occurrence")
-        if occ:
-            date_str = self.format_date_from_fields(occ)
-            place_str = self.format_place_from_fields(occ)
-            if date_str or place_str:
-                lines.append("1 BIRT")
-                if date_str:
-                    lines.append(f"2 DATE {date_str}")
-                if place_str:
-                    lines.append(f"2 PLAC {place_str}")
-        return lines
-
-    def _format_death(self, annotation: dict) -> List[str]:
-        """Format death information for GEDCOM output.
-
-        Args:
-            annotation (dict): The annotation containing death information.
-
-        Returns:
-            List[str]: List of GEDCOM lines for death information.
-        """
-        lines = []
-        occ = annotation.get("death_occurrence")
-        if occ:
-            date_str = self.format_date_from_fields(occ)
-            place_str = self.format_place_from_fields(occ)
-            if date_str or place_str:
-                lines.append("1 DEAT")
-                if date_str:
-                    lines.append(f"2 DATE {date_str}")
-                if place_str:
-                    lines.append(f"2 PLAC {place_str}")
-        return lines
-
-    def _format_residence(self, annotation: dict) -> List[str]:
-        """Format residence information for GEDCOM output.
+    def _append_event(self, annotation: dict, occ_key: str, tag_line: str, lines: List[str]) -> None:
+        """Append date/place lines for one annotation occurrence, if present.
 
         Args:
-            annotation (dict): The annotation containing residence information.
-
-        Returns:
-            List[str]: List of GEDCOM lines for residence information.
+            annotation (dict): The annotation containing the occurrence.
+            occ_key (str): The annotation key holding the occurrence dict.
+            tag_line (str): The constant GEDCOM event line ("1 BIRT", ...).
+            lines (List[str]): The output line list to append to.
         """
-        lines = []
-        occ = annotation.get("residence_occurrence")
+        occ = annotation.get(occ_key)
         if occ:
             date_str = self.format_date_from_fields(occ)
             place_str = self.format_place_from_fields(occ)
             if date_str or place_str:
-                lines.append("1 RESI")
+                lines.append(tag_line)
                 if date_str:
-                    lines.append(f"2 DATE {date_str}")
+                    lines.append(_DATE_PREFIX + date_str)
                 if place_str:
-                    lines.append(f"2 PLAC {place_str}")
-        return lines
+                    lines.append(_PLAC_PREFIX + place_str)
 
     def _format_image(self, node: dict) -> List[str]:
         """Format image information for GEDCOM output.
@@ -294,7 +346,8 @@ class GedcomExporter:
             Optional[str]: Formatted date string for GEDCOM.
         """
         if date_str:
-            return datetime.strptime(date_str, "%Y-%m-%d").strftime("%d %b %Y")
+            year, month, day = date_str.split("-")
+            return f"{int(day):02d} {_MONTH_ABBR[int(month)]} {int(year)}"
         return None
 
     def format_place(self, place_str: Optional[str]) -> Optional[str]:
@@ -313,32 +366,47 @@ class GedcomExporter:
         day = occ.get("day")
         month = occ.get("month")
         year = occ.get("year")
-        if year:
-            try:
-                return datetime(year, month or 1, day or 1).strftime("%d %b %Y") if month and day else \
-                       datetime(year, month or 1, 1).strftime("%b %Y") if month else \
-                       f"{year}"
-            except Exception:
+        # Annotation data is scraped, so guard against malformed fields
+        # (string months, out-of-range days) instead of aborting the export.
+        try:
+            if not year:
                 return None
-        return None
+            if month and not 1 <= month <= 12:
+                return None
+            if month and day:
+                max_day = _DAYS_IN_MONTH[month]
+                if month == 2 and not (year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)):
+                    max_day = 28
+                if not 1 <= day <= max_day:
+                    return None
+                return f"{day:02d} {_MONTH_ABBR[month]} {year}"
+            if month:
+                return f"{_MONTH_ABBR[month]} {year}"
+            return f"{year}"
+        except (TypeError, ValueError):
+            return None
 
     def format_place_from_fields(self, occ: dict) -> Optional[str]:
         """Format place from structured location fields in annotation."""
-        parts = [occ.get("city"), occ.get("county"), occ.get("state"), occ.get("country")]
+        parts = (occ.get("city"), occ.get("county"), occ.get("state"), occ.get("country"))
         return ", ".join(p for p in parts if p)
 
-    def build_individual_entry(self, node_id: str, node: dict, annotation: Optional[dict]) -> List[str]:
-        """Build a GEDCOM entry for an individual.
+    def build_individual_entry(self, node_id: str, node: dict, annotation: Optional[dict], lines: List[str]) -> None:
+        """Append the GEDCOM entry for an individual to the shared line list.
 
         Args:
             node_id (str): The ID of the individual node.
             node (dict): The individual node data.
             annotation (Optional[dict]): The annotation for the individual.
-
-        Returns:
-            List[str]: List of GEDCOM lines for the individual.
+            lines (List[str]): The output line list to append to.
         """
-        lines = [f"0 {self.gedcom.get_gedcom_id(node_id)} INDI"]
+        gid = self.gedcom.get_gedcom_id(node_id)
+        # Ensure we don't duplicate entries for the same individual
+        if gid in self.seen_gedcom_ids:
+            return
+        self.seen_gedcom_ids.add(gid)
+
+        lines.append(f"0 {gid} INDI")
         fname = (annotation.get("first_name") if annotation else None) or node.get("first_name")
         lname = (annotation.get("last_name") if annotation else None) or node.get("last_name")
         sex = (annotation.get("sex") if annotation else None) or node.get("sex")
@@ -359,101 +427,82 @@ class GedcomExporter:
                 lines.append(f"1 ALIA /{annotation['married_name']}/")
 
         if annotation:
-            lines.extend(self._format_birth(annotation))
-            lines.extend(self._format_death(annotation))
-            lines.extend(self._format_residence(annotation))
+            for occ_key, tag_line in _EVENTS:
+                self._append_event(annotation, occ_key, tag_line, lines)
 
         lines.extend(self._format_image(node))
 
         # Check for family relationships and add them to the lines
-        for fam_id, husb_id, wife_id, children in self.gedcom.family_structs:
-            if node_id in children:
-                lines.append(f"1 FAMC {fam_id}")  # Child entry
-            elif node_id == husb_id or node_id == wife_id:
+        for fam_id in self.famc_by_individual.get(node_id, []):
+            lines.append(f"1 FAMC {fam_id}")  # Child entry
+        for fam_id in self.fams_by_individual.get(node_id, []):
+            if fam_id not in self.famc_by_individual.get(node_id, []):
                 lines.append(f"1 FAMS {fam_id}")  # Parent entry
 
-        # Ensure we don't duplicate entries for the same individual
-        if self.gedcom.get_gedcom_id(node_id) in self.seen_gedcom_ids:
-            return []
-        self.seen_gedcom_ids.add(self.gedcom.get_gedcom_id(node_id))
+    def build_family_entries(self, fam_lines: List[str]) -> None:
+        """Append all family entries for the GEDCOM export in a single pass.
 
-        return lines
-
-    def build_partner_families(self) -> List[str]:
-        """Build GEDCOM entries for families based on partner relationships.
+        Each node is visited once; partner links and two-parent links both
+        feed the same dedup set, so every couple is emitted exactly once
+        regardless of how it was discovered.
 
-        Returns:
-            List[str]: List of GEDCOM lines for partner families.
+        Args:
+            fam_lines (List[str]): The output line list to append to.
         """
-        fam_lines = []
+        # Bind hot attribute chains to locals: LOAD_FAST beats LOAD_ATTR in
+        # these inner loops, which run once per node/partner pair.
+        append = fam_lines.append
+        get_id = self.gedcom.get_gedcom_id
+        new_fid = self.gedcom.new_family_id
+        created = self.created_families
+        children_by_pair = self.children_by_parent_pair
+        register = self._register_family
         for node_id, node in self.tree_by_id.items():
+            # Families derived from explicit partner links
             for partner_id in node.get("partner_ids", []):
-                family_key = tuple(sorted((node_id, partner_id)))  # Create a unique family key
-                if family_key in self.created_families:
+                family_key = frozenset((node_id, partner_id))  # Create a unique family key
+                if family_key in created:
                     continue
-                self.created_families.add(family_key)
-                children = [
-                    k for k, v in self.tree_by_id.items()
-                    if set([node_id, partner_id]).issubset(set(v.get("parent_ids", [])))  # Find children of the couple
-                ]
-                node_sex = node.get("sex", "")
-                node_sex = node_sex.upper() if node_sex else ""
-                partner_node = self.tree_by_id.get(partner_id)
-                partner_sex = ""
-                if partner_node and partner_node.get("sex"):
-                    partner_sex = partner_node["sex"].upper()
-                fid = self.gedcom.new_family_id()
-                fam_lines.append(f"0 {fid} FAM")  # Start family entry
-                if node_sex == "M":
-                    fam_lines.append(f"1 HUSB {self.gedcom.get_gedcom_id(node_id)}")  # Husband
-                    fam_lines.append(f"1 WIFE {self.gedcom.get_gedcom_id(partner_id)}")  # Wife
-                elif node_sex == "F":
-                    fam_lines.append(f"1 WIFE {self.gedcom.get_gedcom_id(node_id)}")  # Wife
-                    fam_lines.append(f"1 HUSB {self.gedcom.get_gedcom_id(partner_id)}")  # Husband
+                created.add(family_key)
+                children = children_by_pair.get(family_key, [])  # Find children of the couple
+                node_sex = node.get("sex", "")[:1]  # already uppercased; first letter covers "MALE"/"FEMALE"
+                fid = new_fid()
+                append(f"0 {fid} FAM")  # Start family entry
+                if node_sex == "F":
+                    append(f"1 WIFE {get_id(node_id)}")  # Wife
+                    append(f"1 HUSB {get_id(partner_id)}")  # Husband
                 else:
-                    fam_lines.append(f"1 HUSB {self.gedcom.get_gedcom_id(node_id)}")  # Default to Husband
-                    fam_lines.append(f"1 WIFE {self.gedcom.get_gedcom_id(partner_id)}")  # Default to Wife
+                    append(f"1 HUSB {get_id(node_id)}")  # Husband (default)
+                    append(f"1 WIFE {get_id(partner_id)}")  # Wife (default)
                 for child in children:
-                    fam_lines.append(f"1 CHIL {self.gedcom.get_gedcom_id(child)}")  # Add children
-                self.gedcom.family_structs.append((fid, node_id, partner_id, children))  # Store family structure
-        return fam_lines
+                    append(f"1 CHIL {get_id(child)}")  # Add children
+                register(fid, node_id, partner_id, children)  # Store family structure
 
-    def build_parent_based_families(self) -> List[str]:
-        """Build GEDCOM entries for families based on parent relationships.
-
-        Returns:
-            List[str]: List of GEDCOM lines for parent families.
-        """
-        fam_lines = []
-        for node_id, node in self.tree_by_id.items():
+            # Families implied by a node's two parents, when no partner link covered them
             parent_ids = node.get("parent_ids", [])
             if len(parent_ids) != 2:  # Ensure there are exactly two parents
                 continue
-            pid1, pid2 = sorted(parent_ids)  # Sort parent IDs for consistency
-            family_key = (pid1, pid2)
-            if family_key in self.created_families:
+            family_key = frozenset(parent_ids)
+            if family_key in created:
                 continue
-            self.created_families.add(family_key)
-            fid = self.gedcom.new_family_id()
-            fam_lines.append(f"0 {fid} FAM")  # Start family entry
-            fam_lines.append(f"1 HUSB {self.gedcom.get_gedcom_id(pid1)}")  # Husband
-            fam_lines.append(f"1 WIFE {self.gedcom.get_gedcom_id(pid2)}")  # Wife
-            children = [
-                cid for cid, cnode in self.tree_by_id.items()
-                if set(cnode.get("parent_ids", [])) == set(family_key)  # Find children of the parents
-            ]
+            created.add(family_key)
+            pid1, pid2 = sorted(parent_ids)  # Sort parent IDs for consistent output order
+            # Assign HUSB/WIFE by the parents' sexes, like the partner branch;
+            # fall back to sorted order only when neither sex is known.
+            sex1 = self.tree_by_id.get(pid1, {}).get("sex", "")[:1]
+            sex2 = self.tree_by_id.get(pid2, {}).get("sex", "")[:1]
+            if sex1 == "F" or sex2 == "M":
+                husb_id, wife_id = pid2, pid1
+            else:
+                husb_id, wife_id = pid1, pid2
+            fid = new_fid()
+            append(f"0 {fid} FAM")  # Start family entry
+            append(f"1 HUSB {get_id(husb_id)}")  # Husband
+            append(f"1 WIFE {get_id(wife_id)}")  # Wife
+            children = children_by_pair.get(family_key, [])  # Find children of the parents
             for cid in children:
-                fam_lines.append(f"1 CHIL {self.gedcom.get_gedcom_id(cid)}")  # Add children
-            self.gedcom.family_structs.append((fid, pid1, pid2, children))  # Store family structure
-        return fam_lines
-
-    def build_family_entries(self) -> List[str]:
-        """Build all family entries for the GEDCOM export.
-
-        Returns:
-            List[str]: Combined list of GEDCOM lines for all families.
-        """
-        return self.build_partner_families() + self.build_parent_based_families()
+                append(f"1 CHIL {get_id(cid)}")  # Add children
+            register(fid, husb_id, wife_id, children)  # Store family structure
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate a GEDCOM file from 23andMe family data.")
@@ -9,6 +9,11 @@ from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from concurrent.futures import ThreadPoolExecutor
+import re
 import time
 from pathlib import Path
 from rich import print
@@ -16,18 +21,33 @@ import getpass
 import json
 from typing import Optional
 
+import orjson
 import requests
 from requests import Response
+from requests.adapters import HTTPAdapter, Retry
 
 EXPORT_DIR = Path("23andme_exports")
 EXPORT_DIR.mkdir(exist_ok=True)
 
+# Compiled once: the anti-CSRF cookie names vary ("csrftoken", "XSRF-TOKEN",
+# prefixed variants), so match by pattern rather than exact name.
+_CSRF_COOKIE_RE = re.compile("csrftoken", re.IGNORECASE)
+_XSRF_COOKIE_RE = re.compile("xsrf", re.IGNORECASE)
 
 
-def _seed_session_cookies(driver: webdriver.Chrome) -> requests.Session:
-    """Copy Selenium cookies from the browser to a requests session."""
+
+def _seed_session_cookies(
+    driver: webdriver.Chrome, cookies: Optional[list] = None
+) -> requests.Session:
+    """Copy Selenium cookies from the browser to a requests session.
+
+    Pass a pre-fetched cookie list to avoid an extra chromedriver
+    round-trip; each driver.get_cookies() call is a full command cycle.
+    """
     session = requests.Session()
-    for cookie in driver.get_cookies():
+    if cookies is None:
+        cookies = driver.get_cookies()
+    for cookie in cookies:
         cookie_kwargs = {}
         if cookie.get("domain"):
             cookie_kwargs["domain"] = cookie["domain"]
@@ -41,10 +61,17 @@ def _seed_session_cookies(driver: webdriver.Chrome) -> requests.Session:
     return session
 
 
-def _apply_default_headers(driver: webdriver.Chrome, session: requests.Session, profile_id: str) -> None:
+def _apply_default_headers(
+    driver: webdriver.Chrome,
+    session: requests.Session,
+    profile_id: str,
+    user_agent: Optional[str] = None,
+) -> None:
     """Populate session headers so requests look like authenticated AJAX calls."""
+    if user_agent is None:
+        user_agent = driver.execute_script("return navigator.userAgent;")
     ajax_headers = {
-        "User-Agent": driver.execute_script("return navigator.userAgent;"),
+        "User-Agent": user_agent,
         "Accept": "application/json, text/javascript, */*; q=0.01",
         "Accept-Language": "en-US,en;q=0.9",
         "X-Requested-With": "XMLHttpRequest",
@@ -57,12 +84,13 @@ def _apply_default_headers(driver: webdriver.Chrome, session: requests.Session,
 
     csrf_token = None
     xsrf_token = None
-    for name, value in session.cookies.get_dict().items():
-        lower = name.lower()
-        if "csrftoken" in lower and not csrf_token:
-            csrf_token = value
-        if "xsrf" in lower and not xsrf_token:
-            xsrf_token = value
+    for cookie in session.cookies:
+        if not csrf_token and _CSRF_COOKIE_RE.search(cookie.name):
+            csrf_token = cookie.value
+        if not xsrf_token and _XSRF_COOKIE_RE.search(cookie.name):
+            xsrf_token = cookie.value
+        if csrf_token and xsrf_token:
+            break
 
     if csrf_token:
         session.headers.setdefault("X-CSRFToken", csrf_token)
@@ -70,10 +98,22 @@ def _apply_default_headers(driver: webdriver.Chrome, session: requests.Session,
         session.headers.setdefault("X-XSRF-TOKEN", xsrf_token)
 
 
-def create_authenticated_session(driver: webdriver.Chrome, profile_id: str) -> requests.Session:
+def create_authenticated_session(
+    driver: webdriver.Chrome,
+    profile_id: str,
+    cookies: Optional[list] = None,
+    user_agent: Optional[str] = None,
+) -> requests.Session:
     """Extract cookies from Selenium and create a requests.Session with them."""
-    session = _seed_session_cookies(driver)
-    _apply_default_headers(driver, session, profile_id)
+    session = _seed_session_cookies(driver, cookies)
+    _apply_default_headers(driver, session, profile_id, user_agent)
+
+    # Everything goes to you.23andme.com, so keep one pooled, kept-alive
+    # connection set and retry transient server errors with backoff instead
+    # of paying a fresh TLS handshake (or failing outright) per fetch.
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=16, max_retries=retry)
+    session.mount("https://", adapter)
     return session
 
 
@@ -104,6 +144,45 @@ def _fetch_json(session: requests.Session, url: str, description: str) -> dict:
         ) from error
 
 
+def _stream_json_to_file(
+    session: requests.Session, url: str, description: str, path: Path
+) -> None:
+    """Stream a JSON response straight to disk without parsing it.
+
+    For save-only fetches this keeps a single chunk of the body in memory
+    instead of raw bytes + decoded text + parsed dict all at once.
+    """
+    response: Response = session.get(url, stream=True)
+    try:
+        response.raise_for_status()
+    except requests.HTTPError as error:
+        raise RuntimeError(
+            f"Failed to fetch {description}: HTTP {response.status_code} from {url}"
+        ) from error
+
+    content_type = response.headers.get("Content-Type", "")
+    if "json" not in content_type.lower():
+        snippet = response.text[:200].strip()
+        raise RuntimeError(
+            f"Expected JSON while fetching {description} but got {content_type or 'unknown content-type'}.\n"
+            f"Response snippet: {snippet}"
+        )
+
+    # Stream into a temp file and rename on success so a dropped connection
+    # never leaves a truncated .json behind for load_data to choke on.
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=1 << 16):
+                f.write(chunk)
+    except requests.RequestException as error:
+        tmp_path.unlink(missing_ok=True)
+        raise RuntimeError(
+            f"Connection failed while downloading {description} from {url}"
+        ) from error
+    tmp_path.replace(path)
+
+
 def _fetch_json_via_browser(driver: webdriver.Chrome, url: str, description: str) -> dict:
     """Execute fetch inside the browser context to leverage existing authenticated session."""
     script = """
@@ -173,16 +252,29 @@ def _fetch_json_with_fallback(
     description: str,
     driver: Optional[webdriver.Chrome] = None,
 ) -> dict:
-    """Try fetching JSON via requests session, falling back to browser context when needed."""
+    """Try fetching JSON via requests session, falling back to browser context when needed.
+
+    Results are memoized on the session by URL, so re-requesting the same
+    endpoint within a run costs nothing.
+    """
+    cache = getattr(session, "_json_cache", None)
+    if cache is None:
+        cache = session._json_cache = {}
+    if url in cache:
+        return cache[url]
+
     try:
-        return _fetch_json(session, url, description)
+        data = _fetch_json(session, url, description)
     except RuntimeError as error:
         if driver is None:
             raise
         print(
             f"[yellow]Session fetch for {description} failed ({error}). Retrying via browser context...[/yellow]"
         )
-        return _fetch_json_via_browser(driver, url, description)
+        data = _fetch_json_via_browser(driver, url, description)
+
+    cache[url] = data
+    return data
 
 def init_browser(headless: bool = True) -> webdriver.Chrome:
     """Initialize a Chrome browser with options."""
@@ -191,6 +283,15 @@ def init_browser(headless: bool = True) -> webdriver.Chrome:
         options.add_argument("--headless")
     options.add_argument("--window-size=1920,1080")
     options.add_argument("--disable-gpu")
+    # Block images and push notifications: we only need the DOM and cookies,
+    # and media downloads dominate load time on the 23andMe pages.
+    options.add_experimental_option(
+        "prefs",
+        {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+        },
+    )
     driver = webdriver.Chrome(options=options)
     return driver
 
@@ -199,30 +300,40 @@ def login(driver: webdriver.Chrome, email: str, password: str) -> bool:
     """Login to 23andMe and return True if successful."""
     print("[bold blue]Navigating to login page...[/bold blue]")
     driver.get("https://you.23andme.com/")
-    time.sleep(2)
 
-    email_input = driver.find_element(By.ID, "id_username")
+    # Wait for the login form instead of sleeping a fixed interval
+    email_input = WebDriverWait(driver, 15).until(
+        EC.presence_of_element_located((By.ID, "id_username"))
+    )
     password_input = driver.find_element(By.ID, "id_password")
     email_input.send_keys(email)
     password_input.send_keys(password)
     password_input.send_keys(Keys.RETURN)
-    time.sleep(5)
+
+    # Either the 2FA token field appears or we leave the login page
+    try:
+        WebDriverWait(driver, 20).until(
+            lambda d: d.find_elements(By.ID, "id_token") or "login" not in d.current_url
+        )
+    except TimeoutException:
+        pass
 
     try:
-        # Wait for the 2FA page
-        if "Enter verification code" in driver.page_source or driver.find_elements(By.ID, "id_token"):
+        # Wait for the 2FA page; a targeted element check avoids pulling the
+        # full serialized page source over chromedriver
+        if driver.find_elements(By.ID, "id_token"):
             print("[yellow]2FA required. Please check your email for the verification code.[/yellow]")
-            while True:
-                try:
-                    verification_input = driver.find_element(By.ID, "id_token")
-                    break
-                except:
-                    time.sleep(1)
+            verification_input = WebDriverWait(driver, 300).until(
+                EC.presence_of_element_located((By.ID, "id_token"))
+            )
             code = input("Enter the verification code: ")
             verification_input.send_keys(code)
             submit_button = driver.find_element(By.ID, "mfa-verify-button")
             submit_button.click()
-            time.sleep(5)
+            # Wait for the token form to go away rather than sleeping blindly
+            WebDriverWait(driver, 30).until(
+                lambda d: not d.find_elements(By.ID, "id_token")
+            )
     except Exception as e:
         print(f"[red]Error during 2FA step: {e}[/red]")
 
@@ -230,11 +341,17 @@ def login(driver: webdriver.Chrome, email: str, password: str) -> bool:
     return True
 
 
-def extract_profile_id(driver: webdriver.Chrome) -> str:
+def extract_profile_id(driver: webdriver.Chrome, cookies: Optional[list] = None) -> str:
     """Extracts the current profile_id from cookies."""
-    for cookie in driver.get_cookies():
-        if cookie["name"] == "current-profile-id":
+    if cookies is None:
+        # Targeted lookup: fetches just this cookie instead of the whole jar
+        cookie = driver.get_cookie("current-profile-id")
+        if cookie:
             return cookie["value"]
+    else:
+        for cookie in cookies:
+            if cookie["name"] == "current-profile-id":
+                return cookie["value"]
     raise ValueError("Could not find profile_id in cookies")
 
 
@@ -252,9 +369,7 @@ def fetch_and_save_relatives(
     data = _fetch_json_with_fallback(session, url, f"{limit} relatives", driver=driver)
 
     filename = f"relatives_{limit}.json"
-    with open(filename, "w", encoding="utf-8") as f:
-        import json
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    Path(filename).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
 
     print(f"[bold green]Saved to {filename}[/bold green]")
 
@@ -277,8 +392,7 @@ def fetch_tree_data(
         data = _fetch_json_with_fallback(session, url, f"{name} data", driver=driver)
 
         file_path = Path(f"{name}.json")
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        file_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
 
         print(f"Saved {name} data to {file_path}")
 
@@ -303,31 +417,48 @@ def run_scraper(export_dir: Path) -> None:
     try:
         if login(driver, email, password):
             navigate_to_tree(driver)
-            profile_id = extract_profile_id(driver)
+            # Collect everything the session needs from the browser up front:
+            # one cookie fetch plus one script call, reused everywhere below.
+            cookies = driver.get_cookies()
+            user_agent = driver.execute_script("return navigator.userAgent;")
+            profile_id = extract_profile_id(driver, cookies)
             print(f"[bold green]Using profile ID:[/bold green] {profile_id}")
 
-            session = create_authenticated_session(driver, profile_id)
+            session = create_authenticated_session(driver, profile_id, cookies, user_agent)
 
             export_dir.mkdir(parents=True, exist_ok=True)
-            for limit in [10]:
-                data = _fetch_json_with_fallback(
-                    session,
-                    f"https://you.23andme.com/p/{profile_id}/family/relatives/ajax/?limit={limit}",
-                    f"{limit} relatives",
-                    driver=driver,
-                )
-                (export_dir / f"relatives_{limit}.json").write_text(
-                    json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8"
-                )
-
-            for name, url in {
+            endpoints = {
+                "relatives_10": f"https://you.23andme.com/p/{profile_id}/family/relatives/ajax/?limit=10",
                 "tree": f"https://you.23andme.com/p/{profile_id}/family/tree/ajax/?health=false",
-                "annotations": f"https://you.23andme.com/p/{profile_id}/family/tree/annotations/"
-            }.items():
-                data = _fetch_json_with_fallback(session, url, f"{name} data", driver=driver)
-                (export_dir / f"{name}.json").write_text(
-                    json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8"
-                )
+                "annotations": f"https://you.23andme.com/p/{profile_id}/family/tree/annotations/",
+            }
+
+            # The endpoints are independent and network-bound, so fetch them
+            # concurrently; the browser fallback shares the single driver and
+            # therefore runs serially for any fetch that fails.
+            with ThreadPoolExecutor(max_workers=len(endpoints)) as pool:
+                futures = {
+                    name: pool.submit(
+                        _stream_json_to_file,
+                        session,
+                        url,
+                        f"{name} data",
+                        export_dir / f"{name}.json",
+                    )
+                    for name, url in endpoints.items()
+                }
+                for name, url in endpoints.items():
+                    try:
+                        futures[name].result()
+                    except RuntimeError as error:
+                        print(
+                            f"[yellow]Session fetch for {name} data failed ({error}). "
+                            f"Retrying via browser context...[/yellow]"
+                        )
+                        data = _fetch_json_via_browser(driver, url, f"{name} data")
+                        (export_dir / f"{name}.json").write_bytes(
+                            orjson.dumps(data, option=orjson.OPT_INDENT_2)
+                        )
     finally:
         driver.quit()
 
@@ -340,10 +471,11 @@ if __name__ == "__main__":
     try:
         if login(driver, email, password):
             navigate_to_tree(driver)
-            profile_id = extract_profile_id(driver)
+            cookies = driver.get_cookies()
+            profile_id = extract_profile_id(driver, cookies)
             print(f"[bold green]Using profile ID:[/bold green] {profile_id}")
 
-            session = create_authenticated_session(driver, profile_id)
+            session = create_authenticated_session(driver, profile_id, cookies)
             for limit in [10, 100, 1500]:
                 fetch_and_save_relatives(session, profile_id, limit, driver=driver)
             fetch_tree_data(session, profile_id, driver=driver)
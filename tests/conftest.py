@@ -0,0 +1,16 @@
+import pytest
+
+
+@pytest.fixture(scope="session")
+def shared_driver():
+    """Yield one Chrome instance shared by every test that needs a browser.
+
+    Chrome startup costs seconds; a session-scoped driver pays it once for
+    the whole run. Imports lazily so non-Selenium test runs never touch the
+    browser stack.
+    """
+    from src.scraper import init_browser
+
+    driver = init_browser(headless=True)
+    yield driver
+    driver.quit()
@@ -1,6 +1,6 @@
-import json
 from pathlib import Path
-from datetime import datetime
+
+import orjson
 import pytest
 
 # Import the functions and classes to be tested
@@ -51,9 +51,9 @@ def minimal_data(tmp_path: Path):
     # Save these into temporary files for load_data
     data_dir = tmp_path / "data"
     data_dir.mkdir()
-    (data_dir / "tree.json").write_text(json.dumps(tree_nodes))
-    (data_dir / "annotations.json").write_text(json.dumps(annotations))
-    (data_dir / "relatives_10.json").write_text(json.dumps(relatives))
+    (data_dir / "tree.json").write_bytes(orjson.dumps(tree_nodes))
+    (data_dir / "annotations.json").write_bytes(orjson.dumps(annotations))
+    (data_dir / "relatives_10.json").write_bytes(orjson.dumps(relatives))
     return data_dir
 
 # Test the GEDCOM export with minimal data